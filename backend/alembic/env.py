@@ -13,6 +13,7 @@ load_dotenv()
 
 from app.db import Base  # noqa: E402
 import app.models  # noqa: F401,E402
+from app.history import DEFAULT_PARTITION, PARTITION_PATTERN  # noqa: E402
 
 config = context.config
 
@@ -23,11 +24,19 @@ if database_url:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Monthly tag_assignments partitions are managed by app.history, not the ORM.
+    if type_ == "table" and reflected and (name == DEFAULT_PARTITION or PARTITION_PATTERN.match(name)):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -45,7 +54,11 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         connection.execute(text("SET TIME ZONE 'UTC'"))
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,45 @@
+"""dashboard stat counters
+
+Revision ID: 0002_stat_counters
+Revises: 0001_initial
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_stat_counters"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stat_counters",
+        sa.Column("dimension", sa.Text(), primary_key=True),
+        sa.Column("key", sa.Text(), primary_key=True),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+
+    # Backfill from existing rows; create_bag/upsert_entrupy keep them current afterwards.
+    op.execute(
+        """
+        INSERT INTO stat_counters (dimension, key, count)
+        SELECT 'brand', COALESCE(NULLIF(brand, ''), 'unknown'), count(*)
+        FROM bags
+        GROUP BY COALESCE(NULLIF(brand, ''), 'unknown')
+        UNION ALL
+        SELECT 'tag_status', status, count(*) FROM tags GROUP BY status
+        UNION ALL
+        SELECT 'authentication_status', COALESCE(NULLIF(authentication_status, ''), 'unknown'), count(*)
+        FROM entrupy_items
+        GROUP BY COALESCE(NULLIF(authentication_status, ''), 'unknown')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stat_counters")
@@ -0,0 +1,23 @@
+"""index tags.bag_id for the list_bags tag subquery
+
+Revision ID: 0003_tags_bag_id_index
+Revises: 0002_stat_counters
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_tags_bag_id_index"
+down_revision = "0002_stat_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tags_bag_id", "tags", ["bag_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tags_bag_id", table_name="tags")
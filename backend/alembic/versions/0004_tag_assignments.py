@@ -0,0 +1,71 @@
+"""partitioned tag assignment history
+
+Revision ID: 0004_tag_assignments
+Revises: 0003_tags_bag_id_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_tag_assignments"
+down_revision = "0003_tags_bag_id_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE tag_assignments (
+            id BIGSERIAL NOT NULL,
+            tag_code TEXT NOT NULL,
+            bag_id BIGINT,
+            assigned_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY (id, assigned_at)
+        ) PARTITION BY RANGE (assigned_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_tag_assignments_as_of ON tag_assignments (tag_code, assigned_at, id) INCLUDE (bag_id)"
+    )
+    # Catches rows for months without a partition; `python -m app.history` moves them out.
+    op.execute("CREATE TABLE tag_assignments_default PARTITION OF tag_assignments DEFAULT")
+
+    # Monthly partitions from the oldest backfilled assignment through three
+    # months ahead, so the backfill below never lands in the default partition.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+            month_start date := LEAST(
+                date_trunc('month', now() AT TIME ZONE 'UTC'),
+                (SELECT date_trunc('month', min(updated_at) AT TIME ZONE 'UTC') FROM tags WHERE bag_id IS NOT NULL)
+            );
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF tag_assignments FOR VALUES FROM (%L) TO (%L)',
+                    'tag_assignments_p' || to_char(month_start, 'YYYY_MM'),
+                    month_start::timestamp AT TIME ZONE 'UTC',
+                    (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+
+    # History starts with the current assignment of every tag.
+    op.execute(
+        """
+        INSERT INTO tag_assignments (tag_code, bag_id, assigned_at)
+        SELECT tag_code, bag_id, updated_at FROM tags WHERE bag_id IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE tag_assignments")
@@ -0,0 +1,64 @@
+"""entrupy ingestion queue and dead letters
+
+Revision ID: 0005_entrupy_ingest_queue
+Revises: 0004_tag_assignments
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0005_entrupy_ingest_queue"
+down_revision = "0004_tag_assignments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "entrupy_ingest_queue",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("bag_id", sa.BigInteger(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "available_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "enqueued_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_entrupy_ingest_queue_bag_id", "entrupy_ingest_queue", ["bag_id"])
+
+    op.create_table(
+        "entrupy_dead_letters",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("queue_id", sa.BigInteger(), nullable=False),
+        sa.Column("bag_id", sa.BigInteger(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("enqueued_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "failed_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("entrupy_dead_letters")
+    op.drop_index("ix_entrupy_ingest_queue_bag_id", table_name="entrupy_ingest_queue")
+    op.drop_table("entrupy_ingest_queue")
@@ -0,0 +1,181 @@
+"""
+Tag assignment history: as-of lookups and partition maintenance.
+
+`tag_assignments` is range-partitioned by month on Postgres, with a default
+partition as a safety net. Run the maintenance job from cron (daily is
+plenty) so upcoming partitions exist before rows arrive, rows stranded in
+the default partition get moved out, and expired partitions are dropped or
+archived:
+
+    cd backend
+    python -m app.history --months-ahead 3 --retention-months 24
+    python -m app.history --retention-months 24 --archive-schema history_archive
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models import TagAssignment
+
+TABLE = TagAssignment.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PATTERN = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def assignment_at(db: Session, tag_code: str, at: datetime) -> Optional[TagAssignment]:
+    """Latest assignment of `tag_code` at or before `at`, served from ix_tag_assignments_as_of."""
+    return db.scalar(
+        select(TagAssignment)
+        .where(TagAssignment.tag_code == tag_code, TagAssignment.assigned_at <= as_utc(at))
+        .order_by(TagAssignment.assigned_at.desc(), TagAssignment.id.desc())
+        .limit(1)
+    )
+
+
+def month_start(value: datetime, offset: int = 0) -> datetime:
+    index = value.year * 12 + value.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def is_expired(start: datetime, retention_months: int, now: datetime) -> bool:
+    """Whether the month starting at `start` ended before the retention window."""
+    return month_start(start, 1) <= month_start(now, -retention_months)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_p{start.year:04d}_{start.month:02d}"
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = 3, now: Optional[datetime] = None) -> List[str]:
+    """Create monthly partitions through `months_ahead`, plus any month stranded in the default.
+
+    Rows only reach the default partition when a month had no partition yet
+    (a missed maintenance run, or history backfilled from before the table
+    existed). Those rows are moved into their proper monthly partition, so
+    retention can drop them and the default stays empty.
+    """
+    now = now or datetime.now(timezone.utc)
+    months = {month_start(now, offset) for offset in range(months_ahead + 1)}
+    if DEFAULT_PARTITION in list_partitions(conn):
+        stranded = conn.execute(
+            text(
+                f"SELECT DISTINCT date_trunc('month', assigned_at AT TIME ZONE 'UTC') AS month "
+                f"FROM {DEFAULT_PARTITION}"
+            )
+        )
+        months.update(row.month.replace(tzinfo=timezone.utc) for row in stranded)
+
+    created = []
+    existing = set(list_partitions(conn))
+    for start in sorted(months):
+        name = partition_name(start)
+        if name in existing:
+            continue
+        create_partition(conn, start)
+        created.append(name)
+    return created
+
+
+def create_partition(conn: Connection, start: datetime) -> None:
+    """Create and attach the partition for the month starting at `start`.
+
+    Creating it directly with PARTITION OF fails once the default partition
+    holds rows for that month, so build it standalone, move those rows over,
+    then attach it.
+    """
+    name = partition_name(start)
+    bounds = {"start": start, "end": month_start(start, 1)}
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+    if DEFAULT_PARTITION in list_partitions(conn):
+        conn.execute(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM {DEFAULT_PARTITION} WHERE assigned_at >= :start AND assigned_at < :end "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+            ),
+            bounds,
+        )
+    conn.execute(
+        text(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        )
+    )
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": TABLE},
+    )
+    return [row.relname for row in rows]
+
+
+def expire_partitions(
+    conn: Connection,
+    retention_months: int,
+    archive_schema: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Detach monthly partitions that ended before the retention window.
+
+    Detached partitions are dropped, or moved to `archive_schema` when given.
+    Either way it is a catalog operation, not a row-by-row DELETE.
+    """
+    now = now or datetime.now(timezone.utc)
+    expired = []
+    for name in list_partitions(conn):
+        match = PARTITION_PATTERN.match(name)
+        if not match:
+            continue  # default partition
+        start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        if not is_expired(start, retention_months, now):
+            continue
+        conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        if archive_schema:
+            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+            conn.execute(text(f'ALTER TABLE {name} SET SCHEMA "{archive_schema}"'))
+        else:
+            conn.execute(text(f"DROP TABLE {name}"))
+        expired.append(name)
+    return expired
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain tag_assignments partitions.")
+    parser.add_argument("--months-ahead", type=int, default=3, help="future monthly partitions to keep ready")
+    parser.add_argument("--retention-months", type=int, help="drop partitions older than this many months")
+    parser.add_argument("--archive-schema", help="move expired partitions to this schema instead of dropping")
+    args = parser.parse_args(argv)
+
+    from app.db import engine
+
+    if engine is None:
+        raise SystemExit("Partition maintenance needs DATABASE_URL (not available in in-memory mode)")
+
+    with engine.begin() as conn:
+        for name in ensure_partitions(conn, args.months_ahead):
+            print(f"created {name}")
+        if args.retention_months is not None:
+            for name in expire_partitions(conn, args.retention_months, args.archive_schema):
+                print(f"{'archived' if args.archive_schema else 'dropped'} {name}")
+
+
+if __name__ == "__main__":
+    main()
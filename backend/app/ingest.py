@@ -0,0 +1,282 @@
+"""
+Entrupy result ingestion.
+
+By default `POST /api/admin/entrupy` applies the upsert synchronously. With
+ENTRUPY_ASYNC_INGEST=true the endpoint only validates and enqueues the
+result (202 Accepted); `IngestWorker` drains the queue in batches, applying
+only the newest queued result per bag. Failed results are retried with
+backoff and moved to a dead-letter table after ENTRUPY_INGEST_MAX_ATTEMPTS.
+
+The worker runs as a thread inside the API process unless
+ENTRUPY_INGEST_IN_PROCESS=false, in which case run a dedicated one:
+
+    cd backend
+    python -m app.ingest
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.db import SessionLocal, USE_IN_MEMORY_STORAGE
+from app.models import Bag, EntrupyDeadLetter, EntrupyIngestQueue, EntrupyItem
+from app.stats import AUTHENTICATION_STATUS, bump_counter, move_counter
+from app.storage import in_memory_store
+
+logger = logging.getLogger(__name__)
+
+ENTRUPY_ASYNC_INGEST = os.getenv("ENTRUPY_ASYNC_INGEST", "false").lower() == "true"
+ENTRUPY_INGEST_IN_PROCESS = os.getenv("ENTRUPY_INGEST_IN_PROCESS", "true").lower() == "true"
+BATCH_SIZE = int(os.getenv("ENTRUPY_INGEST_BATCH_SIZE", "200"))
+POLL_SECONDS = float(os.getenv("ENTRUPY_INGEST_POLL_SECONDS", "0.5"))
+MAX_ATTEMPTS = int(os.getenv("ENTRUPY_INGEST_MAX_ATTEMPTS", "5"))
+MAX_BACKOFF_SECONDS = 300
+
+# Only one drainer at a time across processes, so results are applied in queue order.
+DRAIN_LOCK_KEY = 0x656E7472  # "entr"
+
+if ENTRUPY_ASYNC_INGEST and USE_IN_MEMORY_STORAGE and not ENTRUPY_INGEST_IN_PROCESS:
+    # The in-memory queue lives in the API process; a separate worker cannot reach it.
+    raise ValueError("ENTRUPY_INGEST_IN_PROCESS=false requires DATABASE_URL storage, not in-memory storage")
+
+
+class MemoryQueued(NamedTuple):
+    queue_id: int
+    payload: schemas.EntrupyCreate
+    attempts: int = 0
+    available_at: Optional[datetime] = None
+
+
+# In-memory mode keeps the queue in process; it is only as durable as the store itself.
+_memory_ids = itertools.count(1)
+_memory_queue: Deque[MemoryQueued] = deque()
+# bag_id -> newest queue_id applied, so a stale retry never overwrites a newer result
+_memory_applied: Dict[int, int] = {}
+memory_dead_letters: List[Tuple[int, schemas.EntrupyCreate, str]] = []
+
+
+def apply_entrupy(db: Session, payload: schemas.EntrupyCreate) -> EntrupyItem:
+    """Upsert the Entrupy item for `payload.bag_id`; the caller commits."""
+    bag = db.get(Bag, payload.bag_id)
+    if bag is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bag not found")
+
+    # Lock the item so the status we move the counter away from is the one we replace.
+    entrupy_item = db.scalar(
+        select(EntrupyItem).where(EntrupyItem.bag_id == payload.bag_id).with_for_update()
+    )
+    if entrupy_item is None:
+        entrupy_item = EntrupyItem(bag_id=payload.bag_id)
+        db.add(entrupy_item)
+        bump_counter(db, AUTHENTICATION_STATUS, payload.authentication_status)
+    else:
+        move_counter(db, AUTHENTICATION_STATUS, entrupy_item.authentication_status, payload.authentication_status)
+
+    entrupy_item.customer_item_id = payload.customer_item_id
+    entrupy_item.authentication_status = payload.authentication_status
+    entrupy_item.certificate_url = payload.certificate_url
+    entrupy_item.brand = payload.brand
+    entrupy_item.model = payload.model
+    entrupy_item.style = payload.style
+    entrupy_item.color = payload.color
+    entrupy_item.material = payload.material
+    entrupy_item.dimensions = payload.dimensions
+    entrupy_item.condition_grade = payload.condition_grade
+    entrupy_item.catalog_raw = payload.catalog_raw
+    entrupy_item.entrupy_item_id = payload.entrupy_item_id
+    db.flush()
+
+    return entrupy_item
+
+
+def enqueue_entrupy(db: Optional[Session], payload: schemas.EntrupyCreate) -> schemas.EntrupyQueued:
+    if USE_IN_MEMORY_STORAGE:
+        if payload.bag_id not in in_memory_store.bags:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bag not found")
+        queue_id = next(_memory_ids)
+        _memory_queue.append(MemoryQueued(queue_id, payload))
+        return schemas.EntrupyQueued(queue_id=queue_id, bag_id=payload.bag_id)
+
+    if db.get(Bag, payload.bag_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bag not found")
+
+    item = EntrupyIngestQueue(bag_id=payload.bag_id, payload=payload.dict())
+    db.add(item)
+    db.flush()
+    queued = schemas.EntrupyQueued(queue_id=item.id, bag_id=item.bag_id)
+    db.commit()
+
+    return queued
+
+
+def _dead_letter(db: Session, row: EntrupyIngestQueue, error: str) -> None:
+    db.add(
+        EntrupyDeadLetter(
+            queue_id=row.id,
+            bag_id=row.bag_id,
+            payload=row.payload,
+            attempts=row.attempts,
+            last_error=error,
+            enqueued_at=row.enqueued_at,
+        )
+    )
+    db.delete(row)
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(MAX_BACKOFF_SECONDS, 2 ** attempts))
+
+
+def drain_once(db: Session, batch_size: int = BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """Apply one batch of queued results in a single transaction; returns rows consumed."""
+    if db.get_bind().dialect.name == "postgresql":
+        if not db.scalar(select(func.pg_try_advisory_xact_lock(DRAIN_LOCK_KEY))):
+            db.rollback()
+            return 0
+
+    rows = db.scalars(
+        select(EntrupyIngestQueue)
+        .where(EntrupyIngestQueue.available_at <= func.now())
+        .order_by(EntrupyIngestQueue.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    # Rows are in queue order, so the last one seen per bag is the newest.
+    latest: Dict[int, EntrupyIngestQueue] = {}
+    for row in rows:
+        latest[row.bag_id] = row
+
+    now = datetime.now(timezone.utc)
+    for bag_id, row in latest.items():
+        # Older results for this bag are superseded, including ones waiting on a retry.
+        db.execute(
+            delete(EntrupyIngestQueue).where(
+                EntrupyIngestQueue.bag_id == bag_id, EntrupyIngestQueue.id < row.id
+            )
+        )
+        try:
+            payload = schemas.EntrupyCreate.parse_obj(row.payload)
+            with db.begin_nested():
+                apply_entrupy(db, payload)
+        except ValidationError as exc:
+            # Payload no longer matches the schema; retrying cannot help.
+            row.attempts += 1
+            _dead_letter(db, row, str(exc))
+            continue
+        except HTTPException as exc:
+            # The bag is gone; retrying cannot help.
+            row.attempts += 1
+            _dead_letter(db, row, str(exc.detail))
+            continue
+        except Exception as exc:  # noqa: BLE001 - any failure is retried, then dead-lettered
+            row.attempts += 1
+            row.last_error = repr(exc)
+            if row.attempts >= max_attempts:
+                _dead_letter(db, row, row.last_error)
+            else:
+                row.available_at = now + _backoff(row.attempts)
+            continue
+        db.delete(row)
+
+    db.commit()
+    return len(rows)
+
+
+def drain_memory_once(batch_size: int = BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """In-memory counterpart of `drain_once`, with the same coalescing and retries."""
+    now = datetime.now(timezone.utc)
+    batch: List[MemoryQueued] = []
+    waiting: List[MemoryQueued] = []
+    for _ in range(len(_memory_queue)):
+        if len(batch) >= batch_size:
+            break
+        entry = _memory_queue.popleft()
+        if entry.available_at and entry.available_at > now:
+            waiting.append(entry)
+        else:
+            batch.append(entry)
+    _memory_queue.extend(waiting)
+
+    latest: Dict[int, MemoryQueued] = {}
+    for entry in batch:
+        bag_id = entry.payload.bag_id
+        if entry.queue_id <= _memory_applied.get(bag_id, 0):
+            continue  # superseded by a result that was already applied
+        if bag_id not in latest or entry.queue_id > latest[bag_id].queue_id:
+            latest[bag_id] = entry
+
+    for bag_id, entry in latest.items():
+        try:
+            in_memory_store.upsert_entrupy(entry.payload)
+        except HTTPException as exc:
+            memory_dead_letters.append((entry.queue_id, entry.payload, str(exc.detail)))
+            continue
+        except Exception as exc:  # noqa: BLE001 - any failure is retried, then dead-lettered
+            attempts = entry.attempts + 1
+            if attempts >= max_attempts:
+                memory_dead_letters.append((entry.queue_id, entry.payload, repr(exc)))
+            else:
+                _memory_queue.append(entry._replace(attempts=attempts, available_at=now + _backoff(attempts)))
+            continue
+        _memory_applied[bag_id] = entry.queue_id
+
+    return len(batch)
+
+
+class IngestWorker(threading.Thread):
+    """Background thread that drains the ingestion queue until stopped."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE, poll_seconds: float = POLL_SECONDS) -> None:
+        super().__init__(name="entrupy-ingest", daemon=True)
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+
+    def drain(self) -> int:
+        if USE_IN_MEMORY_STORAGE:
+            return drain_memory_once(self.batch_size)
+        with SessionLocal() as db:
+            return drain_once(db, self.batch_size)
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                drained = self.drain()
+            except Exception:  # noqa: BLE001 - keep the worker alive; a failed SQL batch rolls back and stays queued
+                logger.exception("Entrupy ingest batch failed")
+                drained = 0
+            # Keep going while full batches come back; otherwise wait for more work.
+            if drained < self.batch_size:
+                self._stop_event.wait(self.poll_seconds)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        self.join(timeout)
+
+
+if __name__ == "__main__":
+    if USE_IN_MEMORY_STORAGE:
+        raise SystemExit("A standalone worker needs DATABASE_URL; in-memory mode drains inside the API process")
+    logging.basicConfig(level=logging.INFO)
+    worker = IngestWorker()
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(1.0)
+    except KeyboardInterrupt:
+        worker.stop()
@@ -4,6 +4,7 @@ from typing import List
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.ingest import ENTRUPY_ASYNC_INGEST, ENTRUPY_INGEST_IN_PROCESS, IngestWorker
 from app.routers import admin, tags
 
 app = FastAPI(title="Bag Tagging API")
@@ -32,6 +33,22 @@ app.add_middleware(
 app.include_router(admin.router)
 app.include_router(tags.router)
 
+ingest_worker = None
+
+
+@app.on_event("startup")
+def start_ingest_worker():
+    global ingest_worker
+    if ENTRUPY_ASYNC_INGEST and ENTRUPY_INGEST_IN_PROCESS:
+        ingest_worker = IngestWorker()
+        ingest_worker.start()
+
+
+@app.on_event("shutdown")
+def stop_ingest_worker():
+    if ingest_worker is not None:
+        ingest_worker.stop()
+
 
 @app.get("/health")
 def health():
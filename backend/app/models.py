@@ -4,17 +4,22 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import sqlalchemy as sa
-from sqlalchemy import BigInteger, ForeignKey, Text, TIMESTAMP, func
+from sqlalchemy import BigInteger, ForeignKey, Integer, JSON, Text, TIMESTAMP, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
 
+# Postgres types with SQLite fallbacks so the models also run against a local
+# SQLite file (benchmarks). SQLite only autoincrements INTEGER primary keys.
+BigIntPK = BigInteger().with_variant(Integer(), "sqlite")
+JSONDocument = JSONB().with_variant(JSON(), "sqlite")
+
 
 class Bag(Base):
     __tablename__ = "bags"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntPK, primary_key=True, autoincrement=True)
     external_bag_id: Mapped[Optional[str]] = mapped_column(Text, unique=True)
     display_name: Mapped[str] = mapped_column(Text, nullable=False)
     brand: Mapped[str] = mapped_column(Text, nullable=False)
@@ -43,10 +48,10 @@ class Bag(Base):
 class Tag(Base):
     __tablename__ = "tags"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntPK, primary_key=True, autoincrement=True)
     tag_code: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
     bag_id: Mapped[Optional[int]] = mapped_column(
-        BigInteger, ForeignKey("bags.id", ondelete="SET NULL"), nullable=True
+        BigInteger, ForeignKey("bags.id", ondelete="SET NULL"), nullable=True, index=True
     )
     status: Mapped[str] = mapped_column(
         Text, nullable=False, server_default=sa.text("'unassigned'")
@@ -67,7 +72,7 @@ class Tag(Base):
 class EntrupyItem(Base):
     __tablename__ = "entrupy_items"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntPK, primary_key=True, autoincrement=True)
     bag_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("bags.id", ondelete="CASCADE"), nullable=False, unique=True
     )
@@ -80,9 +85,9 @@ class EntrupyItem(Base):
     style: Mapped[Optional[str]] = mapped_column(Text)
     color: Mapped[Optional[str]] = mapped_column(Text)
     material: Mapped[Optional[str]] = mapped_column(Text)
-    dimensions: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    dimensions: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONDocument, nullable=True)
     condition_grade: Mapped[Optional[str]] = mapped_column(Text)
-    catalog_raw: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    catalog_raw: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONDocument, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
     )
@@ -94,3 +99,73 @@ class EntrupyItem(Base):
     )
 
     bag: Mapped["Bag"] = relationship("Bag", back_populates="entrupy_item")
+
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    dimension: Mapped[str] = mapped_column(Text, primary_key=True)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=sa.text("0"))
+
+
+class TagAssignment(Base):
+    """Append-only record of each tag -> bag assignment.
+
+    On Postgres the migration range-partitions the table by month with
+    PRIMARY KEY (id, assigned_at); see app.history for partition maintenance.
+    The ORM only needs `id`, so create_all builds a plain table elsewhere.
+    This mapping is therefore not the migrated layout: make schema changes
+    in a hand-written migration, and alembic/env.py keeps autogenerate from
+    reporting the partitions as tables to drop.
+    """
+
+    __tablename__ = "tag_assignments"
+    __table_args__ = (
+        # Covers as-of lookups, so they are answered from the index alone.
+        sa.Index(
+            "ix_tag_assignments_as_of", "tag_code", "assigned_at", "id", postgresql_include=["bag_id"]
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigIntPK, primary_key=True, autoincrement=True)
+    tag_code: Mapped[str] = mapped_column(Text, nullable=False)
+    bag_id: Mapped[Optional[int]] = mapped_column(BigInteger)
+    assigned_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class EntrupyIngestQueue(Base):
+    """Pending Entrupy results accepted by the async ingestion endpoint."""
+
+    __tablename__ = "entrupy_ingest_queue"
+
+    id: Mapped[int] = mapped_column(BigIntPK, primary_key=True, autoincrement=True)
+    bag_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONDocument, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=sa.text("0"))
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    available_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+    enqueued_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class EntrupyDeadLetter(Base):
+    """Queued Entrupy results that could not be applied."""
+
+    __tablename__ = "entrupy_dead_letters"
+
+    id: Mapped[int] = mapped_column(BigIntPK, primary_key=True, autoincrement=True)
+    queue_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    bag_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONDocument, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    enqueued_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    failed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,12 +1,16 @@
 import os
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db import USE_IN_MEMORY_STORAGE, get_db
 from app import schemas
-from app.models import Bag, EntrupyItem, Tag
+from app.ingest import ENTRUPY_ASYNC_INGEST, apply_entrupy, enqueue_entrupy
+from app.models import Bag, Tag, TagAssignment
+from app.stats import BRAND, TAG_STATUS, bump_counter, move_counter, read_stats
 from app.storage import in_memory_store
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -28,14 +32,22 @@ def create_bag(payload: schemas.BagCreate, db: Session = Depends(get_db)) -> sch
     )
     db.add(bag)
     db.flush()
+    bump_counter(db, BRAND, bag.brand)
 
-    tag = db.scalar(select(Tag).where(Tag.tag_code == payload.tag_code))
+    # Lock the tag so concurrent reassignments serialize on it.
+    tag = db.scalar(select(Tag).where(Tag.tag_code == payload.tag_code).with_for_update())
     if tag is None:
         tag = Tag(tag_code=payload.tag_code)
         db.add(tag)
+        bump_counter(db, TAG_STATUS, "assigned")
+    else:
+        move_counter(db, TAG_STATUS, tag.status, "assigned")
 
     tag.bag_id = bag.id
     tag.status = "assigned"
+    # Taken after the tag lock, so history order matches the order reassignments applied.
+    assigned_at = datetime.now(timezone.utc)
+    db.add(TagAssignment(tag_code=payload.tag_code, bag_id=bag.id, assigned_at=assigned_at))
 
     db.commit()
     db.refresh(bag)
@@ -44,32 +56,20 @@ def create_bag(payload: schemas.BagCreate, db: Session = Depends(get_db)) -> sch
     return schemas.BagWithTag(bag=bag, tag=tag)
 
 
-@router.post("/entrupy", response_model=schemas.Entrupy)
+@router.post(
+    "/entrupy",
+    response_model=schemas.Entrupy,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.EntrupyQueued}},
+)
 def upsert_entrupy(payload: schemas.EntrupyCreate, db: Session = Depends(get_db)) -> schemas.Entrupy:
+    if ENTRUPY_ASYNC_INGEST:
+        queued = enqueue_entrupy(db, payload)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=queued.dict())
+
     if USE_IN_MEMORY_STORAGE:
         return in_memory_store.upsert_entrupy(payload)
 
-    bag = db.get(Bag, payload.bag_id)
-    if bag is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bag not found")
-
-    entrupy_item = db.scalar(select(EntrupyItem).where(EntrupyItem.bag_id == payload.bag_id))
-    if entrupy_item is None:
-        entrupy_item = EntrupyItem(bag_id=payload.bag_id)
-        db.add(entrupy_item)
-
-    entrupy_item.customer_item_id = payload.customer_item_id
-    entrupy_item.authentication_status = payload.authentication_status
-    entrupy_item.certificate_url = payload.certificate_url
-    entrupy_item.brand = payload.brand
-    entrupy_item.model = payload.model
-    entrupy_item.style = payload.style
-    entrupy_item.color = payload.color
-    entrupy_item.material = payload.material
-    entrupy_item.dimensions = payload.dimensions
-    entrupy_item.condition_grade = payload.condition_grade
-    entrupy_item.catalog_raw = payload.catalog_raw
-    entrupy_item.entrupy_item_id = payload.entrupy_item_id
+    entrupy_item = apply_entrupy(db, payload)
 
     db.commit()
     db.refresh(entrupy_item)
@@ -114,3 +114,11 @@ def list_bags(db: Session = Depends(get_db)) -> list[schemas.BagSummary]:
         )
         for row in rows
     ]
+
+
+@router.get("/stats", response_model=schemas.DashboardStats)
+def get_stats(db: Session = Depends(get_db)) -> schemas.DashboardStats:
+    if USE_IN_MEMORY_STORAGE:
+        return in_memory_store.stats()
+
+    return read_stats(db)
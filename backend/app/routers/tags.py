@@ -1,9 +1,13 @@
+from datetime import datetime, timezone
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app import schemas
 from app.db import USE_IN_MEMORY_STORAGE, get_db
+from app.history import assignment_at
 from app.models import Bag, EntrupyItem, Tag
 from app.storage import in_memory_store
 
@@ -29,3 +33,19 @@ def get_tag(tag_code: str, db: Session = Depends(get_db)) -> schemas.TagLookupRe
             entrupy = db.scalar(select(EntrupyItem).where(EntrupyItem.bag_id == bag.id))
 
     return schemas.TagLookupResponse(tag=tag, bag=bag, entrupy=entrupy)
+
+
+@router.get("/{tag_code}/assignment", response_model=schemas.TagAssignment)
+def get_tag_assignment(
+    tag_code: str, at: Optional[datetime] = None, db: Session = Depends(get_db)
+) -> schemas.TagAssignment:
+    """Which bag the tag was assigned to at time `at` (default: now)."""
+    at = at or datetime.now(timezone.utc)
+    if USE_IN_MEMORY_STORAGE:
+        return in_memory_store.assignment_at(tag_code, at)
+
+    assignment = assignment_at(db, tag_code, at)
+    if assignment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No assignment for tag at that time")
+
+    return assignment
@@ -74,6 +74,11 @@ class Entrupy(EntrupyBase):
         orm_mode = True
 
 
+class EntrupyQueued(BaseModel):
+    queue_id: int
+    bag_id: int
+
+
 class BagWithTag(BaseModel):
     bag: Bag
     tag: Tag
@@ -102,3 +107,18 @@ class TagLookupResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class TagAssignment(BaseModel):
+    tag_code: str
+    bag_id: Optional[int] = None
+    assigned_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class DashboardStats(BaseModel):
+    by_brand: Dict[str, int] = Field(default_factory=dict)
+    by_tag_status: Dict[str, int] = Field(default_factory=dict)
+    by_authentication_status: Dict[str, int] = Field(default_factory=dict)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.models import StatCounter
+
+BRAND = "brand"
+TAG_STATUS = "tag_status"
+AUTHENTICATION_STATUS = "authentication_status"
+
+DIMENSIONS = (BRAND, TAG_STATUS, AUTHENTICATION_STATUS)
+
+# Counter keys are part of the primary key, so missing values get a placeholder.
+UNKNOWN_KEY = "unknown"
+
+
+def counter_key(value: Optional[str]) -> str:
+    return value if value else UNKNOWN_KEY
+
+
+def bump_counter(db: Session, dimension: str, value: Optional[str], delta: int = 1) -> None:
+    """Add `delta` to a dashboard counter inside the caller's transaction."""
+    if delta == 0:
+        return
+
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(StatCounter).values(dimension=dimension, key=counter_key(value), count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatCounter.dimension, StatCounter.key],
+        set_={"count": StatCounter.count + delta},
+    )
+    db.execute(stmt)
+
+
+def move_counter(db: Session, dimension: str, old: Optional[str], new: Optional[str]) -> None:
+    """Shift one unit from `old` to `new`; no-op when the key is unchanged.
+
+    Both counter rows stay locked until commit, so they are always taken in
+    key order; otherwise opposite moves (A->B and B->A) can deadlock.
+    """
+    old_key, new_key = counter_key(old), counter_key(new)
+    if old_key == new_key:
+        return
+    for key, delta in sorted([(old_key, -1), (new_key, 1)]):
+        bump_counter(db, dimension, key, delta)
+
+
+def build_stats(counters: Dict[str, Dict[str, int]]) -> schemas.DashboardStats:
+    def positive(dimension: str) -> Dict[str, int]:
+        return {k: v for k, v in sorted(counters.get(dimension, {}).items()) if v > 0}
+
+    return schemas.DashboardStats(
+        by_brand=positive(BRAND),
+        by_tag_status=positive(TAG_STATUS),
+        by_authentication_status=positive(AUTHENTICATION_STATUS),
+    )
+
+
+def read_stats(db: Session) -> schemas.DashboardStats:
+    counters: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+    for row in db.execute(select(StatCounter.dimension, StatCounter.key, StatCounter.count)):
+        counters.setdefault(row.dimension, {})[row.key] = row.count
+    return build_stats(counters)
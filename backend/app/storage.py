@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import bisect
+import os
 from datetime import datetime, timezone
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 
 from app import schemas
+from app.history import as_utc
+from app.stats import AUTHENTICATION_STATUS, BRAND, DIMENSIONS, TAG_STATUS, build_stats, counter_key
 
 IN_MEMORY_ENABLED = True
 
@@ -22,10 +26,21 @@ class InMemoryStore:
         self.tags: Dict[int, schemas.Tag] = {}
         self.entrupy_items: Dict[int, schemas.Entrupy] = {}
         self.tag_code_map: Dict[str, int] = {}
+        self.counters: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+        # tag_code -> assignments in time order, with their timestamps kept alongside for bisect
+        self.tag_history: Dict[str, List[schemas.TagAssignment]] = {}
+        self.tag_history_times: Dict[str, List[datetime]] = {}
 
     def _now(self) -> datetime:
         return datetime.now(timezone.utc)
 
+    def _bump(self, dimension: str, value: Optional[str], delta: int = 1) -> None:
+        counts = self.counters[dimension]
+        key = counter_key(value)
+        counts[key] = counts.get(key, 0) + delta
+        if counts[key] <= 0:
+            del counts[key]
+
     def _ensure_capacity(self) -> None:
         # Keep at most `limit` records for bags/tags/entrupy (drop oldest by id)
         if len(self.bags) > self.limit:
@@ -33,12 +48,19 @@ class InMemoryStore:
             self._remove_bag(oldest_id)
 
     def _remove_bag(self, bag_id: int) -> None:
-        self.bags.pop(bag_id, None)
+        bag = self.bags.pop(bag_id, None)
+        if bag:
+            self._bump(BRAND, bag.brand, -1)
         tags_to_delete = [tid for tid, t in self.tags.items() if t.bag_id == bag_id]
         for tid in tags_to_delete:
             tag = self.tags.pop(tid)
             self.tag_code_map.pop(tag.tag_code, None)
-        self.entrupy_items.pop(bag_id, None)
+            self.tag_history.pop(tag.tag_code, None)
+            self.tag_history_times.pop(tag.tag_code, None)
+            self._bump(TAG_STATUS, tag.status, -1)
+        entrupy = self.entrupy_items.pop(bag_id, None)
+        if entrupy:
+            self._bump(AUTHENTICATION_STATUS, entrupy.authentication_status, -1)
 
     def create_bag_with_tag(self, payload: schemas.BagCreate) -> schemas.BagWithTag:
         created_at = self._now()
@@ -56,6 +78,7 @@ class InMemoryStore:
         )
         self.bags[bag.id] = bag
         self._bag_id += 1
+        self._bump(BRAND, bag.brand)
 
         tag_id = self.tag_code_map.get(payload.tag_code)
         if tag_id is None:
@@ -70,11 +93,19 @@ class InMemoryStore:
             self.tags[tag.id] = tag
             self.tag_code_map[payload.tag_code] = tag.id
             self._tag_id += 1
+            self._bump(TAG_STATUS, tag.status)
         else:
             tag = self.tags[tag_id]
+            self._bump(TAG_STATUS, tag.status, -1)
+            self._bump(TAG_STATUS, "assigned")
             tag = tag.copy(update={"bag_id": bag.id, "status": "assigned", "updated_at": created_at})
             self.tags[tag_id] = tag
 
+        self.tag_history.setdefault(tag.tag_code, []).append(
+            schemas.TagAssignment(tag_code=tag.tag_code, bag_id=bag.id, assigned_at=created_at)
+        )
+        self.tag_history_times.setdefault(tag.tag_code, []).append(created_at)
+
         self._ensure_capacity()
         return schemas.BagWithTag(bag=bag, tag=tag)
 
@@ -110,6 +141,9 @@ class InMemoryStore:
             updated_at=now,
         )
         self.entrupy_items[payload.bag_id] = entrupy
+        if existing:
+            self._bump(AUTHENTICATION_STATUS, existing.authentication_status, -1)
+        self._bump(AUTHENTICATION_STATUS, entrupy.authentication_status)
         return entrupy
 
     def lookup_tag(self, tag_code: str) -> Tuple[schemas.Tag, Optional[schemas.Bag], Optional[schemas.Entrupy]]:
@@ -122,11 +156,22 @@ class InMemoryStore:
         entrupy = self.entrupy_items.get(bag.id) if bag else None
         return tag, bag, entrupy
 
+    def assignment_at(self, tag_code: str, at: datetime) -> schemas.TagAssignment:
+        index = bisect.bisect_right(self.tag_history_times.get(tag_code, []), as_utc(at))
+        if index == 0:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No assignment for tag at that time")
+        return self.tag_history[tag_code][index - 1]
+
     def list_bags(self) -> list[schemas.BagSummary]:
         ordered_bags = sorted(self.bags.values(), key=lambda b: b.id, reverse=True)
+        # First tag per bag in insertion order, built once instead of scanned per bag.
+        tag_by_bag: Dict[int, schemas.Tag] = {}
+        for t in self.tags.values():
+            if t.bag_id is not None:
+                tag_by_bag.setdefault(t.bag_id, t)
         summaries: list[schemas.BagSummary] = []
         for bag in ordered_bags:
-            tag = next((t for t in self.tags.values() if t.bag_id == bag.id), None)
+            tag = tag_by_bag.get(bag.id)
             summaries.append(
                 schemas.BagSummary(
                     id=bag.id,
@@ -140,5 +185,8 @@ class InMemoryStore:
             )
         return summaries
 
+    def stats(self) -> schemas.DashboardStats:
+        return build_stats(self.counters)
+
 
-in_memory_store = InMemoryStore()
+in_memory_store = InMemoryStore(limit=int(os.getenv("IN_MEMORY_LIMIT", "2")))
@@ -0,0 +1,53 @@
+"""Pydantic construction cost of the response models."""
+from datetime import datetime, timezone
+
+import pytest
+
+from app import schemas
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BAG = {
+    "id": 1,
+    "display_name": "Bench bag",
+    "brand": "Hermes",
+    "model": "Birkin",
+    "color": "black",
+    "created_at": NOW,
+    "updated_at": NOW,
+}
+TAG = {"id": 1, "tag_code": "BM-00000001", "status": "assigned", "bag_id": 1, "created_at": NOW, "updated_at": NOW}
+ENTRUPY = {
+    "id": 1,
+    "bag_id": 1,
+    "customer_item_id": "bench-item-1",
+    "authentication_status": "authentic",
+    "dimensions": {"width": 30, "height": 22},
+    "catalog_raw": {"source": "bench", "attributes": {"hardware": "gold", "size": 30}},
+    "created_at": NOW,
+    "updated_at": NOW,
+}
+
+
+class Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def test_bag(benchmark):
+    benchmark(lambda: schemas.Bag(**BAG))
+
+
+def test_bag_from_orm(benchmark):
+    row = Row(external_bag_id=None, style=None, material=None, **BAG)
+    benchmark(lambda: schemas.Bag.from_orm(row))
+
+
+@pytest.mark.parametrize("with_entrupy", [False, True])
+def test_tag_lookup_response(benchmark, with_entrupy: bool):
+    tag, bag = schemas.Tag(**TAG), schemas.Bag(**BAG)
+    entrupy = schemas.Entrupy(**ENTRUPY) if with_entrupy else None
+    benchmark(lambda: schemas.TagLookupResponse(tag=tag, bag=bag, entrupy=entrupy))
+
+
+def test_tag_lookup_response_from_dicts(benchmark):
+    benchmark(lambda: schemas.TagLookupResponse(tag=TAG, bag=BAG, entrupy=ENTRUPY))
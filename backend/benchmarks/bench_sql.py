@@ -0,0 +1,50 @@
+"""The router SQL paths against SQLite (and Postgres when BENCH_DATABASE_URL is set).
+
+Benchmarks that write use `scratch_db`, which rolls their commits back, so
+every benchmark sees the freshly seeded row counts whatever order they run in.
+"""
+import itertools
+import random
+
+from app import schemas
+
+import dataset
+
+_fresh = itertools.count(10_000_000)
+
+# Fixed rounds keep the amount written inside the rolled-back transaction the same every run.
+WRITE_ROUNDS = 200
+
+
+def test_get_tag(benchmark, sql_routers, db, size: int):
+    _, tags = sql_routers
+    rng = random.Random(dataset.SEED)
+    benchmark(lambda: tags.get_tag(dataset.tag_code(rng.randrange(size)), db=db))
+
+
+def test_list_bags(benchmark, sql_routers, db, size: int):
+    admin, _ = sql_routers
+    result = benchmark.pedantic(admin.list_bags, kwargs={"db": db}, rounds=5, warmup_rounds=1)
+    assert isinstance(result[0], schemas.BagSummary)
+
+
+def test_get_stats(benchmark, sql_routers, db, size: int):
+    admin, _ = sql_routers
+    benchmark(lambda: admin.get_stats(db=db))
+
+
+def test_create_bag(benchmark, sql_routers, scratch_db, size: int):
+    admin, _ = sql_routers
+    rng = random.Random(dataset.SEED)
+    benchmark.pedantic(
+        lambda: admin.create_bag(dataset.bag_create(next(_fresh), rng), db=scratch_db), rounds=WRITE_ROUNDS
+    )
+
+
+def test_upsert_entrupy(benchmark, sql_routers, scratch_db, size: int):
+    admin, _ = sql_routers
+    rng = random.Random(dataset.SEED)
+    benchmark.pedantic(
+        lambda: admin.upsert_entrupy(dataset.entrupy_create(rng.randint(1, size), rng), db=scratch_db),
+        rounds=WRITE_ROUNDS,
+    )
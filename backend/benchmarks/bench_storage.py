@@ -0,0 +1,64 @@
+"""InMemoryStore building blocks at increasing catalog sizes."""
+import itertools
+import random
+
+from app.storage import InMemoryStore
+
+import dataset
+
+_fresh = itertools.count(10_000_000)
+
+# Benchmarks that write run a fixed number of rounds on their own copy of the
+# store, so every run ends in the same state and reads never see their writes.
+WRITE_ROUNDS = 200
+
+
+def test_create_bag_with_tag(benchmark, scratch_store: InMemoryStore, size: int):
+    rng = random.Random(dataset.SEED)
+    benchmark.pedantic(
+        lambda: scratch_store.create_bag_with_tag(dataset.bag_create(next(_fresh), rng)), rounds=WRITE_ROUNDS
+    )
+
+
+def test_create_bag_reusing_tag(benchmark, scratch_store: InMemoryStore, size: int):
+    rng = random.Random(dataset.SEED)
+    codes = list(scratch_store.tag_code_map)
+
+    def create():
+        payload = dataset.bag_create(0, rng).copy(update={"tag_code": rng.choice(codes)})
+        scratch_store.create_bag_with_tag(payload)
+
+    benchmark.pedantic(create, rounds=WRITE_ROUNDS)
+
+
+def test_lookup_tag(benchmark, store: InMemoryStore, size: int):
+    rng = random.Random(dataset.SEED)
+    codes = list(store.tag_code_map)
+    benchmark(lambda: store.lookup_tag(rng.choice(codes)))
+
+
+def test_list_bags(benchmark, store: InMemoryStore, size: int):
+    benchmark.pedantic(store.list_bags, rounds=5, warmup_rounds=1)
+
+
+def test_ensure_capacity(benchmark, scratch_store: InMemoryStore, size: int):
+    rng = random.Random(dataset.SEED)
+
+    def overfill():
+        # Add one bag past the limit without triggering eviction.
+        scratch_store.limit += 1
+        scratch_store.create_bag_with_tag(dataset.bag_create(next(_fresh), rng))
+        scratch_store.limit -= 1
+
+    benchmark.pedantic(scratch_store._ensure_capacity, setup=overfill, rounds=20)
+
+
+def test_stats(benchmark, store: InMemoryStore, size: int):
+    benchmark(store.stats)
+
+
+def test_assignment_at(benchmark, store: InMemoryStore, size: int):
+    rng = random.Random(dataset.SEED)
+    codes = list(store.tag_history)
+    at = store._now()
+    benchmark(lambda: store.assignment_at(rng.choice(codes), at))
@@ -0,0 +1,126 @@
+import copy
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_ROOT = BENCH_DIR.parent
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+# Path and environment setup, plus the `sql_routers` fixture, are shared with the tests.
+from tests.conftest import sql_routers, sqlite_engine  # noqa: E402,F401
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.storage import InMemoryStore  # noqa: E402
+
+import dataset  # noqa: E402
+
+DEFAULT_SIZES = "1000,100000"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-sizes",
+        default=os.getenv("BENCH_SIZES", DEFAULT_SIZES),
+        help="comma-separated record counts, e.g. 1000,100000,1000000",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Keep stored baselines next to the suite regardless of the working directory.
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BENCH_DIR / '.benchmarks'}"
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("--bench-sizes").split(",") if s.strip()]
+        metafunc.parametrize("size", sizes, scope="session")
+    if "dialect" in metafunc.fixturenames:
+        dialects = ["sqlite"]
+        if os.getenv("BENCH_DATABASE_URL"):
+            dialects.append("postgresql")
+        metafunc.parametrize("dialect", dialects, scope="session")
+
+
+_stores: Dict[int, InMemoryStore] = {}
+
+
+def _populated_store(size: int) -> InMemoryStore:
+    if size not in _stores:
+        _stores[size] = dataset.populate_store(size)
+    return _stores[size]
+
+
+@pytest.fixture
+def store(size: int) -> InMemoryStore:
+    """A populated store shared across benchmarks of the same size; read-only."""
+    return _populated_store(size)
+
+
+@pytest.fixture
+def scratch_store(size: int) -> InMemoryStore:
+    """A private copy of the populated store, for benchmarks that write to it.
+
+    The copy's limit equals its size, so creating bags evicts the oldest one
+    and the record count stays constant.
+    """
+    return copy.deepcopy(_populated_store(size))
+
+
+def _sqlite_savepoints(engine: Engine) -> None:
+    # pysqlite manages transactions itself and mishandles SAVEPOINT; emit BEGIN ourselves.
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def db_engine(dialect: str, size: int) -> Iterator[Engine]:
+    if dialect == "sqlite":
+        engine = sqlite_engine()
+        _sqlite_savepoints(engine)
+    else:
+        # Must point at a disposable database: tables are dropped and recreated.
+        engine = create_engine(os.environ["BENCH_DATABASE_URL"], future=True)
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, autoflush=False, future=True)() as db:
+        dataset.populate_db(db, size)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine: Engine) -> Iterator[Session]:
+    """A session on the seeded database; read-only benchmarks only."""
+    with sessionmaker(bind=db_engine, autoflush=False, future=True)() as session:
+        yield session
+
+
+@pytest.fixture
+def scratch_db(db_engine: Engine) -> Iterator[Session]:
+    """A session whose commits are rolled back afterwards, for benchmarks that write.
+
+    The routers commit, so each commit only releases a savepoint inside an
+    outer transaction; the seeded data is unchanged for the next benchmark.
+    """
+    with db_engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint") as session:
+            yield session
+        transaction.rollback()
@@ -0,0 +1,121 @@
+"""Deterministic dataset generator shared by the microbenchmarks."""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.models import Bag, EntrupyItem, StatCounter, Tag
+from app.storage import InMemoryStore
+
+BRANDS = ["Hermes", "Chanel", "Louis Vuitton", "Gucci", "Prada", "Dior", "Celine", "Fendi"]
+COLORS = ["black", "brown", "red", "beige", "white"]
+AUTH_STATUSES = ["authentic", "unidentified", "pending", None]
+SEED = 20240101
+
+
+def tag_code(index: int) -> str:
+    return f"BM-{index:08d}"
+
+
+def bag_create(index: int, rng: random.Random) -> schemas.BagCreate:
+    return schemas.BagCreate(
+        display_name=f"Bench bag {index}",
+        brand=rng.choice(BRANDS),
+        model=f"Model {rng.randint(1, 50)}",
+        color=rng.choice(COLORS),
+        tag_code=tag_code(index),
+    )
+
+
+def entrupy_create(bag_id: int, rng: random.Random) -> schemas.EntrupyCreate:
+    return schemas.EntrupyCreate(
+        bag_id=bag_id,
+        customer_item_id=f"bench-item-{bag_id}",
+        authentication_status=rng.choice(AUTH_STATUSES),
+        condition_grade=rng.choice(["A", "B", "C"]),
+        dimensions={"width": rng.randint(20, 40), "height": rng.randint(15, 30)},
+    )
+
+
+def populate_store(size: int, entrupy_every: int = 2) -> InMemoryStore:
+    """Fill an InMemoryStore with `size` bags through its public methods."""
+    rng = random.Random(SEED)
+    store = InMemoryStore(limit=size)
+    for index in range(size):
+        created = store.create_bag_with_tag(bag_create(index, rng))
+        if index % entrupy_every == 0:
+            store.upsert_entrupy(entrupy_create(created.bag.id, rng))
+    return store
+
+
+def _rows(size: int, entrupy_every: int) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+    rng = random.Random(SEED)
+    now = datetime.now(timezone.utc)
+    chunk = 10_000
+    for start in range(0, size, chunk):
+        bags, tags, items = [], [], []
+        for index in range(start, min(size, start + chunk)):
+            bag_id = index + 1
+            bags.append(
+                {
+                    "id": bag_id,
+                    "display_name": f"Bench bag {index}",
+                    "brand": rng.choice(BRANDS),
+                    "model": f"Model {rng.randint(1, 50)}",
+                    "color": rng.choice(COLORS),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            tags.append(
+                {
+                    "id": bag_id,
+                    "tag_code": tag_code(index),
+                    "bag_id": bag_id,
+                    "status": "assigned",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            if index % entrupy_every == 0:
+                items.append(
+                    {
+                        "bag_id": bag_id,
+                        "customer_item_id": f"bench-item-{bag_id}",
+                        "authentication_status": rng.choice(AUTH_STATUSES),
+                        "condition_grade": rng.choice(["A", "B", "C"]),
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+        yield {"bags": bags, "tags": tags, "items": items}
+
+
+def populate_db(db: Session, size: int, entrupy_every: int = 2) -> None:
+    """Bulk-load `size` bags with tags and Entrupy items, bypassing the routers."""
+    counters: Dict[tuple, int] = {}
+    for batch in _rows(size, entrupy_every):
+        db.execute(insert(Bag), batch["bags"])
+        db.execute(insert(Tag), batch["tags"])
+        if batch["items"]:
+            db.execute(insert(EntrupyItem), batch["items"])
+        for bag in batch["bags"]:
+            counters[("brand", bag["brand"])] = counters.get(("brand", bag["brand"]), 0) + 1
+        counters[("tag_status", "assigned")] = counters.get(("tag_status", "assigned"), 0) + len(batch["tags"])
+        for item in batch["items"]:
+            key = ("authentication_status", item["authentication_status"] or "unknown")
+            counters[key] = counters.get(key, 0) + 1
+    db.execute(
+        insert(StatCounter),
+        [{"dimension": dimension, "key": key, "count": count} for (dimension, key), count in counters.items()],
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # Explicit ids above leave the serial sequences behind.
+        for table in ("bags", "tags", "entrupy_items"):
+            db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+    db.commit()
@@ -0,0 +1,378 @@
+"""
+End-to-end load generator for the Bag Tagging API.
+
+Seeds bags/tags/Entrupy items through the public endpoints, then replays a
+scan mix (Zipf-distributed tag lookups plus periodic create_bag,
+upsert_entrupy and list_bags) at a fixed target rate and reports latency
+percentiles and throughput as JSON.
+
+Run the API in either storage mode first, e.g.:
+
+    USE_IN_MEMORY_STORAGE=true IN_MEMORY_LIMIT=1000000 \\
+        PYTHONPATH=backend uvicorn app.main:app --port 8000
+
+then:
+
+    python backend/benchmarks/loadgen.py --bags 10000 --rate 200 --duration 60 \\
+        --output results.json
+
+Use --trace-out to record the generated request sequence and --trace-in to
+replay it exactly against another commit; --compare prints the relative
+change against a previous results file. Seed into a fresh database (or a
+freshly started in-memory server) for every run you want to compare;
+--skip-seed reuses data from an earlier run instead of seeding again.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+PERCENTILES = (("p50", 50.0), ("p95", 95.0), ("p99", 99.0), ("p999", 99.9))
+DEFAULT_MIX = "lookup=90,create_bag=4,upsert_entrupy=5,list_bags=1"
+BRANDS = ["Hermes", "Chanel", "Louis Vuitton", "Gucci", "Prada", "Dior", "Celine", "Fendi"]
+AUTH_STATUSES = ["authentic", "unidentified", "pending", None]
+
+
+class Client:
+    """Keep-alive HTTP client with one connection per worker thread."""
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, bytes]:
+        """Send one request; status 0 means a connection error.
+
+        A GET is retried once on a fresh connection, since the server may have
+        closed an idle keep-alive socket. Writes are never retried: the server
+        may already have applied them.
+        """
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        attempts = 2 if method == "GET" else 1
+        for _ in range(attempts):
+            conn = self._connection()
+            try:
+                conn.request(method, self.prefix + path, body=data, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+        return 0, b""
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("lookup", "create_bag", "upsert_entrupy", "list_bags"):
+            raise SystemExit(f"unknown operation in --mix: {name!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+def tag_code(prefix: str, index: int) -> str:
+    return f"{prefix}-{index:07d}"
+
+
+def bag_payload(rng: random.Random, code: str, index: int) -> Dict[str, Any]:
+    return {
+        "display_name": f"Load bag {index}",
+        "brand": rng.choice(BRANDS),
+        "model": f"Model {rng.randint(1, 50)}",
+        "color": rng.choice(["black", "brown", "red", "beige"]),
+        "tag_code": code,
+    }
+
+
+def entrupy_payload(rng: random.Random, index: int) -> Dict[str, Any]:
+    return {
+        "customer_item_id": f"load-item-{index}",
+        "authentication_status": rng.choice(AUTH_STATUSES),
+        "condition_grade": rng.choice(["A", "B", "C"]),
+    }
+
+
+def seed(client: Client, args: argparse.Namespace) -> List[int]:
+    """Create `--bags` bags (one tag each) and Entrupy items for a fraction of them."""
+    rng = random.Random(args.seed)
+    bag_ids: List[int] = []
+
+    def create(index: int) -> Tuple[int, Optional[int]]:
+        status, body = client.request(
+            "POST", "/api/admin/bags", bag_payload(random.Random(args.seed + index), tag_code(args.prefix, index), index)
+        )
+        return status, json.loads(body)["bag"]["id"] if status == 201 else None
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for status, bag_id in pool.map(create, range(args.bags)):
+            if bag_id is None:
+                raise SystemExit(f"seeding failed: POST /api/admin/bags returned {status}")
+            bag_ids.append(bag_id)
+
+        with_entrupy = [i for i in range(args.bags) if rng.random() < args.entrupy_fraction]
+
+        def attach(index: int) -> int:
+            payload = entrupy_payload(random.Random(args.seed + index), index)
+            payload["bag_id"] = bag_ids[index]
+            return client.request("POST", "/api/admin/entrupy", payload)[0]
+
+        for status in pool.map(attach, with_entrupy):
+            # 202 when the server runs with ENTRUPY_ASYNC_INGEST=true.
+            if not 200 <= status < 300:
+                raise SystemExit(f"seeding failed: POST /api/admin/entrupy returned {status}")
+
+    return bag_ids
+
+
+def resolve_seeded(client: Client, args: argparse.Namespace) -> List[int]:
+    """Look up the bag ids of data seeded by an earlier run (--skip-seed)."""
+
+    def resolve(index: int) -> Optional[int]:
+        status, body = client.request("GET", f"/api/tags/{tag_code(args.prefix, index)}")
+        bag = json.loads(body).get("bag") if status == 200 else None
+        return bag["id"] if bag else None
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        bag_ids = list(pool.map(resolve, range(args.bags)))
+    missing = bag_ids.count(None)
+    if missing:
+        raise SystemExit(f"--skip-seed: {missing} of {args.bags} seeded tags not found; seed a fresh database first")
+    return bag_ids
+
+
+def read_trace(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    with open(path) as fh:
+        lines = [json.loads(line) for line in fh if line.strip()]
+    if not lines or "header" not in lines[0]:
+        raise SystemExit(f"{path}: missing trace header; record it again with --trace-out")
+    return lines[0]["header"], lines[1:]
+
+
+def generate_trace(args: argparse.Namespace) -> Iterable[Dict[str, Any]]:
+    """Yield a deterministic request sequence; bags are referenced by seed index."""
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    ops = list(mix)
+    op_weights = list(itertools.accumulate(mix[op] for op in ops))
+    # Zipf over seeded tags: tag k (1-based rank) is hit with weight 1 / k**s.
+    tag_weights = list(itertools.accumulate(1.0 / (rank ** args.zipf) for rank in range(1, args.bags + 1)))
+    total = int(args.rate * args.duration)
+
+    for i in range(total):
+        op = rng.choices(ops, cum_weights=op_weights)[0]
+        if op == "lookup":
+            index = rng.choices(range(args.bags), cum_weights=tag_weights)[0]
+            yield {"op": op, "index": index}
+        elif op == "create_bag":
+            yield {"op": op, "index": args.bags + i}
+        elif op == "upsert_entrupy":
+            yield {"op": op, "index": rng.randrange(args.bags)}
+        else:
+            yield {"op": op}
+
+
+def execute(client: Client, args: argparse.Namespace, bag_ids: List[int], step: Dict[str, Any]) -> int:
+    op = step["op"]
+    if op == "lookup":
+        return client.request("GET", f"/api/tags/{tag_code(args.prefix, step['index'])}")[0]
+    if op == "create_bag":
+        index = step["index"]
+        payload = bag_payload(random.Random(args.seed + index), tag_code(args.prefix, index), index)
+        return client.request("POST", "/api/admin/bags", payload)[0]
+    if op == "upsert_entrupy":
+        index = step["index"]
+        payload = entrupy_payload(random.Random(args.seed + index + len(bag_ids)), index)
+        payload["bag_id"] = bag_ids[index]
+        return client.request("POST", "/api/admin/entrupy", payload)[0]
+    return client.request("GET", "/api/admin/bags")[0]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    summary: Dict[str, Any] = {
+        "count": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+    for name, pct in PERCENTILES:
+        summary[f"{name}_ms"] = round(percentile(ordered, pct), 3)
+    return summary
+
+
+def run(client: Client, args: argparse.Namespace, bag_ids: List[int], trace: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Open-loop replay: each request is scheduled at start + i / rate.
+
+    Latency is measured from the scheduled send time, so a saturated server
+    shows up as queueing delay instead of silently lowering the offered load.
+    """
+    lock = threading.Lock()
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    interval = 1.0 / args.rate
+
+    def fire(step: Dict[str, Any], scheduled: float) -> None:
+        status = execute(client, args, bag_ids, step)
+        latency_ms = (time.perf_counter() - scheduled) * 1000.0
+        ok = 200 <= status < 300
+        with lock:
+            latencies.setdefault(step["op"], []).append(latency_ms)
+            if not ok:
+                errors[step["op"]] = errors.get(step["op"], 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i, step in enumerate(trace):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, step, scheduled)
+    elapsed = time.perf_counter() - start
+
+    all_samples = [value for values in latencies.values() for value in values]
+    return {
+        "config": {
+            "bags": args.bags,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": args.mix,
+            "rate_rps": args.rate,
+            "seed": args.seed,
+            "trace": args.trace_in,
+            "zipf": args.zipf,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "operations": {
+            op: summarize(values, errors.get(op, 0), elapsed) for op, values in sorted(latencies.items())
+        },
+        "overall": summarize(all_samples, sum(errors.values()), elapsed),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = []
+    metrics = ["throughput_rps", "mean_ms"] + [f"{name}_ms" for name, _ in PERCENTILES]
+    sections = [("overall", current["overall"], baseline.get("overall", {}))]
+    for op, stats in current["operations"].items():
+        sections.append((op, stats, baseline.get("operations", {}).get(op, {})))
+    for name, now, before in sections:
+        for metric in metrics:
+            if metric in before and before[metric]:
+                change = (now[metric] - before[metric]) / before[metric] * 100.0
+                lines.append(f"{name:16} {metric:15} {before[metric]:>10} -> {now[metric]:>10} ({change:+.1f}%)")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--bags", type=int, help="bags/tags to seed (default: 1000, or the trace's value)")
+    parser.add_argument("--entrupy-fraction", type=float, default=0.5, help="share of seeded bags with Entrupy data")
+    parser.add_argument("--rate", type=float, default=100.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of replay")
+    parser.add_argument("--concurrency", type=int, default=16, help="worker threads")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for hot-tag lookups")
+    parser.add_argument("--seed", type=int, help="RNG seed for data and requests (default: 1, or the trace's value)")
+    parser.add_argument("--prefix", help="tag code prefix for seeded data (default: LG, or the trace's value)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument(
+        "--skip-seed", action="store_true", help="reuse data seeded by an earlier run against the same database"
+    )
+    parser.add_argument("--trace-out", help="write the generated request sequence as JSONL")
+    parser.add_argument("--trace-in", help="replay a request sequence recorded with --trace-out")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="results JSON from a previous run to diff against")
+    args = parser.parse_args(argv)
+
+    # The trace header pins the dataset the recorded requests refer to.
+    header: Dict[str, Any] = {}
+    trace: List[Dict[str, Any]] = []
+    if args.trace_in:
+        header, trace = read_trace(args.trace_in)
+    for name, default in (("bags", 1000), ("seed", 1), ("prefix", "LG")):
+        recorded, given = header.get(name), getattr(args, name)
+        if recorded is not None and given is not None and given != recorded:
+            raise SystemExit(f"--{name} {given} does not match the trace (recorded with {recorded})")
+        setattr(args, name, given if given is not None else recorded if recorded is not None else default)
+
+    client = Client(args.base_url, args.timeout)
+
+    if args.skip_seed:
+        print(f"resolving {args.bags} seeded bags ...", file=sys.stderr)
+        bag_ids = resolve_seeded(client, args)
+    else:
+        # Seeding again into a database that already holds this dataset would
+        # double the catalog and reassign every tag, skewing comparisons.
+        if client.request("GET", f"/api/tags/{tag_code(args.prefix, 0)}")[0] == 200:
+            raise SystemExit(
+                f"tags with prefix {args.prefix!r} already exist: start from a fresh database, "
+                "pass --skip-seed to reuse them, or choose another --prefix"
+            )
+        print(f"seeding {args.bags} bags ...", file=sys.stderr)
+        bag_ids = seed(client, args)
+
+    if not args.trace_in:
+        trace = list(generate_trace(args))
+    if args.trace_out:
+        with open(args.trace_out, "w") as fh:
+            fh.write(json.dumps({"header": {"bags": args.bags, "prefix": args.prefix, "seed": args.seed}}) + "\n")
+            for step in trace:
+                fh.write(json.dumps(step, sort_keys=True) + "\n")
+
+    print(f"replaying {len(trace)} requests at {args.rate:g} rps ...", file=sys.stderr)
+    results = run(client, args, bag_ids, trace)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        print("\n".join(compare(results, baseline)), file=sys.stderr)
+
+    return 1 if results["overall"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Shared test setup; benchmarks/conftest.py reuses it as `tests.conftest`."""
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+# Tests build their own engines; keep app.db from requiring DATABASE_URL.
+os.environ.setdefault("USE_IN_MEMORY_STORAGE", "true")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db import Base  # noqa: E402
+
+
+def sqlite_engine() -> Engine:
+    """A private in-memory SQLite database, shared by every session on the engine."""
+    return create_engine(
+        "sqlite://", future=True, connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    engine = sqlite_engine()
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, autoflush=False, future=True)() as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def sql_routers(monkeypatch):
+    """Route handlers with the SQL branch forced on."""
+    from app.routers import admin, tags
+
+    monkeypatch.setattr(admin, "USE_IN_MEMORY_STORAGE", False)
+    monkeypatch.setattr(tags, "USE_IN_MEMORY_STORAGE", False)
+    return admin, tags
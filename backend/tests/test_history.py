@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app import history, schemas
+from app.storage import InMemoryStore
+
+
+def bag(tag_code: str) -> schemas.BagCreate:
+    return schemas.BagCreate(display_name="bag", brand="Hermes", tag_code=tag_code)
+
+
+def test_in_memory_assignment_at():
+    store = InMemoryStore(limit=10)
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    first = store.create_bag_with_tag(bag("T1"))
+    second = store.create_bag_with_tag(bag("T1"))
+
+    assert store.assignment_at("T1", first.tag.updated_at).bag_id == first.bag.id
+    assert store.assignment_at("T1", second.tag.updated_at).bag_id == second.bag.id
+    with pytest.raises(HTTPException):
+        store.assignment_at("T1", before)
+
+
+def test_sql_reassigning_a_tag_twice_quickly_keeps_both_rows(db, sql_routers):
+    admin, tags = sql_routers
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    first = admin.create_bag(bag("T1"), db=db).bag
+    second = admin.create_bag(bag("T1"), db=db).bag
+    third = admin.create_bag(bag("T1"), db=db).bag
+
+    assert tags.get_tag_assignment("T1", db=db).bag_id == third.id
+    rows = db.query(admin.TagAssignment).order_by(admin.TagAssignment.id).all()
+    assert [row.bag_id for row in rows] == [first.id, second.id, third.id]
+    with pytest.raises(HTTPException):
+        tags.get_tag_assignment("T1", at=before, db=db)
+
+    # Pin the timestamps so the as-of results do not depend on clock resolution.
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    for offset, row in enumerate(rows):
+        row.assigned_at = start + timedelta(minutes=offset)
+    db.commit()
+    assert tags.get_tag_assignment("T1", at=start, db=db).bag_id == first.id
+    assert tags.get_tag_assignment("T1", at=start + timedelta(seconds=90), db=db).bag_id == second.id
+
+    # Ties on assigned_at resolve by id, so the latest row at that time wins.
+    rows[2].assigned_at = rows[1].assigned_at
+    db.commit()
+    assert tags.get_tag_assignment("T1", at=rows[1].assigned_at, db=db).bag_id == third.id
+
+
+def test_month_start_wraps_years():
+    value = datetime(2026, 1, 31, 23, 59, tzinfo=timezone.utc)
+    assert history.month_start(value) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert history.month_start(value, -1) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert history.month_start(value, -13) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert history.month_start(datetime(2026, 12, 5, tzinfo=timezone.utc), 1) == datetime(
+        2027, 1, 1, tzinfo=timezone.utc
+    )
+
+
+def test_partition_expires_once_it_ends_before_the_retention_window():
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    # 24 months of retention keeps everything from 2024-10-01 on.
+    assert history.is_expired(datetime(2024, 9, 1, tzinfo=timezone.utc), 24, now)
+    assert not history.is_expired(datetime(2024, 10, 1, tzinfo=timezone.utc), 24, now)
+    # With no retention only months that ended before the current one go.
+    assert history.is_expired(datetime(2026, 9, 1, tzinfo=timezone.utc), 0, now)
+    assert not history.is_expired(datetime(2026, 10, 1, tzinfo=timezone.utc), 0, now)
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app import ingest, schemas
+from app.models import EntrupyDeadLetter, EntrupyIngestQueue, EntrupyItem
+from app.storage import InMemoryStore
+
+
+def result(bag_id: int, authentication_status: str) -> schemas.EntrupyCreate:
+    return schemas.EntrupyCreate(bag_id=bag_id, customer_item_id="item", authentication_status=authentication_status)
+
+
+def fail_apply(monkeypatch):
+    def boom(db, payload):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(ingest, "apply_entrupy", boom)
+
+
+@pytest.fixture
+def bag_id(db, sql_routers, monkeypatch):
+    admin, _ = sql_routers
+    monkeypatch.setattr(ingest, "USE_IN_MEMORY_STORAGE", False)
+    payload = schemas.BagCreate(display_name="bag", brand="Hermes", tag_code="T1")
+    return admin.create_bag(payload, db=db).bag.id
+
+
+def make_available(db):
+    for row in db.scalars(select(EntrupyIngestQueue)):
+        row.available_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+
+
+def test_drain_once_applies_only_newest_result_per_bag(db, bag_id):
+    for authentication_status in ("pending", "unidentified", "authentic"):
+        ingest.enqueue_entrupy(db, result(bag_id, authentication_status))
+
+    assert ingest.drain_once(db) == 3
+    assert db.scalar(select(EntrupyItem.authentication_status)) == "authentic"
+    assert db.scalars(select(EntrupyIngestQueue)).all() == []
+
+
+def test_drain_once_retries_then_dead_letters(db, bag_id, monkeypatch):
+    fail_apply(monkeypatch)
+    ingest.enqueue_entrupy(db, result(bag_id, "pending"))
+
+    ingest.drain_once(db, max_attempts=2)
+    row = db.scalar(select(EntrupyIngestQueue))
+    assert row.attempts == 1
+    assert "db down" in row.last_error
+    # Backing off: nothing is ready on the next pass.
+    assert ingest.drain_once(db, max_attempts=2) == 0
+
+    make_available(db)
+    ingest.drain_once(db, max_attempts=2)
+    assert db.scalars(select(EntrupyIngestQueue)).all() == []
+    dead = db.scalar(select(EntrupyDeadLetter))
+    assert (dead.bag_id, dead.attempts) == (bag_id, 2)
+
+
+def test_drain_once_dead_letters_missing_bag_immediately(db, bag_id):
+    db.add(EntrupyIngestQueue(bag_id=999, payload=result(999, "pending").dict()))
+    db.commit()
+
+    ingest.drain_once(db)
+    dead = db.scalar(select(EntrupyDeadLetter))
+    assert (dead.bag_id, dead.last_error) == (999, "Bag not found")
+
+
+def test_newer_result_supersedes_row_in_backoff(db, bag_id, monkeypatch):
+    fail_apply(monkeypatch)
+    ingest.enqueue_entrupy(db, result(bag_id, "pending"))
+    ingest.drain_once(db)
+    assert db.scalar(select(EntrupyIngestQueue.attempts)) == 1
+
+    monkeypatch.undo()
+    monkeypatch.setattr(ingest, "USE_IN_MEMORY_STORAGE", False)
+    ingest.enqueue_entrupy(db, result(bag_id, "authentic"))
+    ingest.drain_once(db)
+
+    assert db.scalars(select(EntrupyIngestQueue)).all() == []
+    assert db.scalar(select(EntrupyItem.authentication_status)) == "authentic"
+
+
+@pytest.fixture
+def memory_store(monkeypatch):
+    store = InMemoryStore(limit=10)
+    monkeypatch.setattr(ingest, "in_memory_store", store)
+    monkeypatch.setattr(ingest, "USE_IN_MEMORY_STORAGE", True)
+    monkeypatch.setattr(ingest, "_memory_queue", ingest.deque())
+    monkeypatch.setattr(ingest, "_memory_applied", {})
+    monkeypatch.setattr(ingest, "memory_dead_letters", [])
+    return store
+
+
+def test_drain_memory_once_requeues_failures_and_skips_stale_retries(memory_store, monkeypatch):
+    bag = memory_store.create_bag_with_tag(
+        schemas.BagCreate(display_name="bag", brand="Hermes", tag_code="T1")
+    ).bag
+    upsert = memory_store.upsert_entrupy
+
+    def fail_once(payload):
+        monkeypatch.setattr(memory_store, "upsert_entrupy", upsert)
+        raise RuntimeError("transient")
+
+    monkeypatch.setattr(memory_store, "upsert_entrupy", fail_once)
+    ingest.enqueue_entrupy(None, result(bag.id, "pending"))
+    ingest.drain_memory_once()
+    (retry,) = ingest._memory_queue
+    assert retry.attempts == 1
+
+    # A newer result lands while the old one backs off; the stale retry must not win.
+    ingest.enqueue_entrupy(None, result(bag.id, "authentic"))
+    ingest.drain_memory_once()
+    ingest._memory_queue[0] = retry._replace(available_at=None)
+    ingest.drain_memory_once()
+
+    assert not ingest._memory_queue
+    assert memory_store.entrupy_items[bag.id].authentication_status == "authentic"
+
+
+def test_drain_once_dead_letters_malformed_row_and_applies_the_rest(db, bag_id):
+    db.add(EntrupyIngestQueue(bag_id=999, payload={"bag_id": 999}))
+    db.commit()
+    ingest.enqueue_entrupy(db, result(bag_id, "authentic"))
+
+    assert ingest.drain_once(db) == 2
+    assert db.scalars(select(EntrupyIngestQueue)).all() == []
+    assert db.scalar(select(EntrupyItem.authentication_status)) == "authentic"
+    dead = db.scalar(select(EntrupyDeadLetter))
+    assert dead.bag_id == 999
+    assert "customer_item_id" in dead.last_error
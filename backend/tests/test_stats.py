@@ -0,0 +1,79 @@
+from app import schemas
+from app.storage import InMemoryStore
+
+
+def bag(brand: str, tag_code: str) -> schemas.BagCreate:
+    return schemas.BagCreate(display_name=f"{brand} bag", brand=brand, tag_code=tag_code)
+
+
+def entrupy(bag_id: int, authentication_status) -> schemas.EntrupyCreate:
+    return schemas.EntrupyCreate(bag_id=bag_id, customer_item_id="item", authentication_status=authentication_status)
+
+
+def test_in_memory_counters_track_insert_reassign_status_and_eviction():
+    store = InMemoryStore(limit=2)
+
+    first = store.create_bag_with_tag(bag("Hermes", "T1")).bag
+    store.upsert_entrupy(entrupy(first.id, "pending"))
+    stats = store.stats()
+    assert stats.by_brand == {"Hermes": 1}
+    assert stats.by_tag_status == {"assigned": 1}
+    assert stats.by_authentication_status == {"pending": 1}
+
+    # Status change moves the count instead of adding one.
+    store.upsert_entrupy(entrupy(first.id, "authentic"))
+    assert store.stats().by_authentication_status == {"authentic": 1}
+
+    # Reassigning T1 keeps a single assigned tag.
+    second = store.create_bag_with_tag(bag("Chanel", "T1")).bag
+    store.upsert_entrupy(entrupy(second.id, None))
+    stats = store.stats()
+    assert stats.by_brand == {"Chanel": 1, "Hermes": 1}
+    assert stats.by_tag_status == {"assigned": 1}
+    assert stats.by_authentication_status == {"authentic": 1, "unknown": 1}
+
+    # A third bag evicts the first, along with its Entrupy item.
+    store.create_bag_with_tag(bag("Chanel", "T2"))
+    stats = store.stats()
+    assert stats.by_brand == {"Chanel": 2}
+    assert stats.by_tag_status == {"assigned": 2}
+    assert stats.by_authentication_status == {"unknown": 1}
+
+
+def test_sql_counters_track_insert_reassign_and_status(db, sql_routers):
+    admin, _ = sql_routers
+
+    first = admin.create_bag(bag("Hermes", "T1"), db=db).bag
+    admin.upsert_entrupy(entrupy(first.id, "pending"), db=db)
+    stats = admin.get_stats(db=db)
+    assert stats.by_brand == {"Hermes": 1}
+    assert stats.by_tag_status == {"assigned": 1}
+    assert stats.by_authentication_status == {"pending": 1}
+
+    admin.upsert_entrupy(entrupy(first.id, "authentic"), db=db)
+    assert admin.get_stats(db=db).by_authentication_status == {"authentic": 1}
+
+    second = admin.create_bag(bag("Chanel", "T1"), db=db).bag
+    admin.upsert_entrupy(entrupy(second.id, None), db=db)
+    admin.create_bag(bag("Chanel", "T2"), db=db)
+    stats = admin.get_stats(db=db)
+    assert stats.by_brand == {"Chanel": 2, "Hermes": 1}
+    assert stats.by_tag_status == {"assigned": 2}
+    assert stats.by_authentication_status == {"authentic": 1, "unknown": 1}
+
+
+def test_move_counter_locks_rows_in_key_order(monkeypatch):
+    from app import stats
+
+    calls = []
+    monkeypatch.setattr(stats, "bump_counter", lambda db, dimension, key, delta: calls.append((key, delta)))
+
+    stats.move_counter(None, stats.AUTHENTICATION_STATUS, "pending", "authentic")
+    stats.move_counter(None, stats.AUTHENTICATION_STATUS, "authentic", "pending")
+    stats.move_counter(None, stats.AUTHENTICATION_STATUS, None, "authentic")
+
+    assert calls == [
+        ("authentic", 1), ("pending", -1),
+        ("authentic", -1), ("pending", 1),
+        ("authentic", 1), ("unknown", -1),
+    ]